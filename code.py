@@ -1,3 +1,7 @@
+import os
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import streamlit as st
 import plotly.express as px
@@ -23,24 +27,88 @@ CSS = """
 """
 st.markdown(CSS, unsafe_allow_html=True)
 
-# Завантаження даних
-survey_df = pd.read_csv("survey_data_updated.csv", sep=';')
-impact_df = pd.read_csv("impact_data_updated.csv")
-
-#Об'єднання даних
+# Шкала середнього часу гри (години)
+TIME_MAPPING = {'менше 1 години': 0.5, 'близько 1 години': 1, 'близько 2 годин': 2,
+                'близько 3 годин': 3, 'близько 4 годин': 4, '4 години і більше': 5}
+SURVEY_DATA_PATH = "survey_data_updated.csv"
+IMPACT_DATA_PATH = "impact_data_updated.csv"
 merge_key_col = 'ID'
-if merge_key_col in survey_df.columns and merge_key_col in impact_df.columns:
+# Скільки відфільтрованих представлень тримати в пам'яті
+VIEW_REGISTRY_SIZE = 16
+
+
+class ViewRegistry:
+    """LRU-реєстр відфільтрованих представлень, ключ — стан фільтрів.
+
+    Повертає поверхневі копії: завдяки copy-on-write запис у них не змінює кеш.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return tuple(view.copy(deep=False) for view in self._views[key])
+        views = tuple(build())
+        with self._lock:
+            self._views[key] = views
+            self._views.move_to_end(key)
+            while len(self._views) > self.max_entries:
+                self._views.popitem(last=False)
+        return tuple(view.copy(deep=False) for view in views)
+
+
+# Завантаження даних та похідні стовпці (один раз на версію файлів; mtime входить у ключ кешу)
+@st.cache_resource(max_entries=1)
+def load_base_data(survey_path, impact_path, data_mtimes):
+    survey_df = pd.read_csv(survey_path, sep=';')
+    impact_df = pd.read_csv(impact_path)
+
+    #Об'єднання даних
+    if merge_key_col not in survey_df.columns or merge_key_col not in impact_df.columns:
+        return survey_df, None
     survey_df[merge_key_col] = survey_df[merge_key_col].astype(str)
     impact_df[merge_key_col] = impact_df[merge_key_col].astype(str)
     merged_df = pd.merge(survey_df, impact_df, on=merge_key_col, how='outer')
-else:
+
+    if 'Вік' in survey_df.columns:
+        survey_df['Вік_cleaned'] = pd.to_numeric(survey_df['Вік'], errors='coerce')
+    if 'Девайс' in survey_df.columns:
+        survey_df['Девайс'] = survey_df['Девайс'].astype(str)
+    if 'Час' in survey_df.columns:
+        survey_df['Час_число'] = survey_df['Час'].map(TIME_MAPPING)
+    for col in ['Категорія позитивного впливу', 'Категорія негативного впливу']:
+        if col in merged_df.columns:
+            merged_df[col] = merged_df[col].str.strip()
+    return survey_df, merged_df
+
+
+@st.cache_resource(max_entries=1)
+def get_view_registry(survey_path, impact_path, data_mtimes):
+    return ViewRegistry(VIEW_REGISTRY_SIZE)
+
+
+def filter_views(survey_df, merged_df, age_filter):
+    if age_filter is None:
+        return survey_df, merged_df
+    filtered_survey_df = survey_df[survey_df['Вік_cleaned'].isin(age_filter)]
+    filtered_merged_df = merged_df[merged_df[merge_key_col].isin(filtered_survey_df[merge_key_col])]
+    return filtered_survey_df, filtered_merged_df
+
+
+data_mtimes = (os.path.getmtime(SURVEY_DATA_PATH), os.path.getmtime(IMPACT_DATA_PATH))
+survey_df, merged_df = load_base_data(SURVEY_DATA_PATH, IMPACT_DATA_PATH, data_mtimes)
+if merged_df is None:
     st.error(f"Помилка: Стовпець '{merge_key_col}' відсутній в одному або обох DataFrame. Перевірте назви стовпців.")
     st.stop()
 
 #Фільтр за віком 
 st.sidebar.header("Фільтри")
-if 'Вік' in survey_df.columns:
-    survey_df['Вік_cleaned'] = pd.to_numeric(survey_df['Вік'], errors='coerce')
+if 'Вік_cleaned' in survey_df.columns:
     cleaned_ages = survey_df['Вік_cleaned'].dropna().unique().astype(int)
     cleaned_ages_sorted = sorted(cleaned_ages)
 
@@ -59,12 +127,9 @@ if 'Вік' in survey_df.columns:
 else:
     st.sidebar.warning("Стовпець 'Вік' не знайдено у survey_df. Фільтрація за віком недоступна.")
     age_filter = None
-if age_filter is not None and 'Вік_cleaned' in survey_df.columns:
-    filtered_survey_df = survey_df[survey_df['Вік_cleaned'].isin(age_filter)].copy()
-    filtered_merged_df = merged_df[merged_df[merge_key_col].isin(filtered_survey_df[merge_key_col])].copy()
-else:
-    filtered_survey_df = survey_df.copy()
-    filtered_merged_df = merged_df.copy()
+view_key = tuple(age_filter) if age_filter is not None else None
+filtered_survey_df, filtered_merged_df = get_view_registry(SURVEY_DATA_PATH, IMPACT_DATA_PATH, data_mtimes).get(
+    view_key, lambda: filter_views(survey_df, merged_df, age_filter))
 
 if filtered_survey_df.empty:
     st.warning("Немає даних, що відповідають вибраним критеріям фільтрації.")
@@ -174,11 +239,9 @@ with tab1:
             st.markdown("</div>", unsafe_allow_html=True)
     # 6. Розподіл часу гри
     if 'Час' in filtered_survey_df:
-        time_mapping = {'менше 1 години': 0.5, 'близько 1 години': 1, 'близько 2 годин': 2,
-                        'близько 3 годин': 3, 'близько 4 годин': 4, '4 години і більше': 5}
         time_counts = filtered_survey_df['Час'].value_counts().reset_index(name='Кількість')
         time_counts.columns = ['Час_текст', 'Кількість']
-        time_counts['Час_число'] = time_counts['Час_текст'].map(time_mapping)
+        time_counts['Час_число'] = time_counts['Час_текст'].map(TIME_MAPPING)
         time_counts = time_counts.sort_values(by='Час_число')
         with col3:
             st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -187,8 +250,8 @@ with tab1:
                                         template='plotly_white',
                                         color_discrete_sequence=px.colors.qualitative.T10,
                                         hover_data={'Час_число': False, 'Час_текст': True, 'Кількість': True})
-            fig_playtime_area.update_layout(xaxis=dict(tickvals=list(time_mapping.values()),
-                                                        ticktext=list(time_mapping.values()),
+            fig_playtime_area.update_layout(xaxis=dict(tickvals=list(TIME_MAPPING.values()),
+                                                        ticktext=list(TIME_MAPPING.values()),
                                                         title="Середній час гри за день (години)"),
                                             yaxis_title="Кількість гравців",
                                             plot_bgcolor='rgba(0,0,0,0)',
@@ -201,7 +264,6 @@ with tab1:
     col1, col2, col3 = st.columns(3)
     # 7. Популярність девайсів
     if 'Девайс' in filtered_survey_df:
-        filtered_survey_df['Девайс'] = filtered_survey_df['Девайс'].astype(str)
         platform_series = filtered_survey_df[
             (filtered_survey_df['Девайс'] != '-') &
             (filtered_survey_df['Девайс'].str.lower() != 'nan')
@@ -228,20 +290,18 @@ with tab1:
             st.markdown("</div>", unsafe_allow_html=True)
     # 8. Розподіл популярності девайсів за жанрами (%)
     if 'Девайс' in filtered_survey_df and 'Жанр' in filtered_survey_df:
-        filtered_survey_df['Девайс'] = filtered_survey_df['Девайс'].astype(str)
         device_genre_df = filtered_survey_df[
             (filtered_survey_df['Девайс'].notna()) &
             (filtered_survey_df['Девайс'].str.lower() != 'інше') &
             (filtered_survey_df['Девайс'] != '-') &
             (filtered_survey_df['Девайс'].str.lower() != 'nan') &
             (filtered_survey_df['Жанр'].notna())
-        ].copy()
-        device_genre_df['Девайс'] = device_genre_df['Девайс'].str.lower().str.split(',').apply(
-            lambda lst: [d.strip() for d in lst])
-        device_genre_df['Жанр'] = device_genre_df['Жанр'].str.split(',').apply(
-            lambda lst: [g.strip() for g in lst])
+        ]
+        device_genre_df = device_genre_df.assign(
+            Девайс=device_genre_df['Девайс'].str.lower().str.split(',').apply(lambda lst: [d.strip() for d in lst]),
+            Жанр=device_genre_df['Жанр'].str.split(',').apply(lambda lst: [g.strip() for g in lst]))
         exploded_device_genre_df = device_genre_df.explode('Девайс').explode('Жанр')
-        exploded_device_genre_df_filtered = exploded_device_genre_df[exploded_device_genre_df['Жанр'] != '-'].copy()
+        exploded_device_genre_df_filtered = exploded_device_genre_df[exploded_device_genre_df['Жанр'] != '-']
         genre_device_counts = exploded_device_genre_df_filtered.groupby(['Жанр', 'Девайс']).size().reset_index(
             name='Кількість')
         genre_totals = genre_device_counts.groupby('Жанр')['Кількість'].transform('sum')
@@ -289,11 +349,7 @@ with tab1:
     # 9. Середній час гри за жанром
 
     if 'Час' in filtered_survey_df and 'Жанр' in filtered_survey_df:
-        time_mapping = {'менше 1 години': 0.5, 'близько 1 години': 1, 'близько 2 годин': 2,
-                        'близько 3 годин': 3, 'близько 4 годин': 4, '4 години і більше': 5}
-        filtered_survey_df['Час_число'] = filtered_survey_df['Час'].map(time_mapping)
-        
-        filtered_genre_df = filtered_survey_df[filtered_survey_df['Жанр'] != '-'].copy()
+        filtered_genre_df = filtered_survey_df[filtered_survey_df['Жанр'] != '-']
         
         genre_counts = filtered_genre_df['Жанр'].value_counts().reset_index(name='Кількість гравців')
         genre_counts.columns = ['Жанр', 'Кількість гравців']
@@ -375,9 +431,6 @@ with tab2:
     # Порівняння впливу за категоріями впливу
 
     if 'Категорія позитивного впливу' in filtered_merged_df.columns and 'Категорія негативного впливу' in filtered_merged_df.columns:
-        filtered_merged_df['Категорія позитивного впливу'] = filtered_merged_df['Категорія позитивного впливу'].str.strip()
-        filtered_merged_df['Категорія негативного впливу'] = filtered_merged_df['Категорія негативного впливу'].str.strip()
-
         positive_impact_categories = filtered_merged_df['Категорія позитивного впливу'].value_counts().reset_index(name='Кількість')
         positive_impact_categories.columns = ['Категорія', 'Позитивний вплив']
         negative_impact_categories = filtered_merged_df['Категорія негативного впливу'].value_counts().reset_index(name='Кількість')
@@ -580,10 +633,10 @@ with tab2:
 
     filtered_positive_genres = filtered_merged_df[
         (filtered_merged_df['Жанр позитивного впливу'] != 'Всі') & (filtered_merged_df['Жанр позитивного впливу'] != '0')
-    ].copy()
+    ]
     filtered_negative_genres = filtered_merged_df[
         (filtered_merged_df['Жанр негативного впливу'] != 'Всі') & (filtered_merged_df['Жанр негативного впливу'] != '0')
-    ].copy()
+    ]
 #Четвертий ряд
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -635,7 +688,6 @@ with tab2:
         st.plotly_chart(fig_heatmap_neg, use_container_width=True)
     #Вплив часу гри 
     with col2:
-        time_impact_df = filtered_merged_df[['Час', 'Позитивний вплив', 'Негативний вплив']].copy()
         time_mapping = {
             "менше 1 години": 0.5,
             "близько 1 години": 1,
@@ -643,9 +695,11 @@ with tab2:
             "близько 3 годин": 3,
             "4 години і більше": 4,
         }
-        time_impact_df['Час_число'] = time_impact_df['Час'].map(time_mapping)
-        time_impact_df['Позитивний вплив'] = time_impact_df['Позитивний вплив'].apply(lambda x: 1 if x == 'Так' else 0)
-        time_impact_df['Негативний вплив'] = time_impact_df['Негативний вплив'].apply(lambda x: 1 if x == 'Так' else 0)
+        time_impact_df = pd.DataFrame({
+            'Час_число': filtered_merged_df['Час'].map(time_mapping),
+            'Позитивний вплив': (filtered_merged_df['Позитивний вплив'] == 'Так').astype(int),
+            'Негативний вплив': (filtered_merged_df['Негативний вплив'] == 'Так').astype(int),
+        })
         grouped_by_time = time_impact_df.groupby('Час_число')[['Позитивний вплив', 'Негативний вплив']].sum()
         total_positive_tak = time_impact_df['Позитивний вплив'].sum()
         total_negative_tak = time_impact_df['Негативний вплив'].sum()